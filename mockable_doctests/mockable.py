@@ -5,7 +5,28 @@ doctests to be mocked as a part of a unittest suite.
 import copy
 import doctest
 import functools
+import importlib
+import pkgutil
+import sys
 import types
+import weakref
+
+
+# The kinds of value that copy_value knows how to copy.  The kinds of
+# class attributes are cached by _class_kinds, so that copying a class
+# doesn't have to repeat the type checks for every attribute.
+_KIND_CLASS = "class"
+_KIND_CLASSMETHOD = "classmethod"
+_KIND_DATA = "data"
+_KIND_FUNCTION = "function"
+_KIND_METHOD = "method"
+_KIND_MOCK = "mock"
+_KIND_PROPERTY = "property"
+_KIND_STATICMETHOD = "staticmethod"
+_CALLABLE_KINDS = (_KIND_CLASSMETHOD, _KIND_FUNCTION, _KIND_METHOD, _KIND_STATICMETHOD)
+
+# Maps classes to dicts of attribute names to (raw __dict__ entry, kind)
+_class_kinds_cache = weakref.WeakKeyDictionary()
 
 
 class Mock(object):
@@ -39,7 +60,111 @@ class MockCallable(Mock):
         return self.cal(*args, **kwargs)
 
 
-def copy_callable(name, original, new_globals=None, clas=None):
+class LazyTarget(object):
+    """
+    Stands in for a mock value by its dotted import path.  Tests that
+    use one don't have their mocks applied until their globals are first
+    used, when they run, so the module it lives in isn't imported while
+    the tests are being collected.
+    >>> target = LazyTarget("os.path.join")
+    >>> import os.path
+    >>> target.resolve() is os.path.join
+    True
+
+    The value is only looked up once.
+    >>> target.resolve() is target.resolve()
+    True
+
+    A path that doesn't lead anywhere says where it stopped.
+    >>> LazyTarget("os.path.no_such_thing").resolve()
+    Traceback (most recent call last):
+    ...
+    ImportError: Cannot resolve os.path.no_such_thing: 'module' object has no attribute 'no_such_thing'
+    >>> LazyTarget("no_such_module.thing").resolve()
+    Traceback (most recent call last):
+    ...
+    ImportError: No module named no_such_module
+    """
+    def __init__(self, path):
+        super(LazyTarget, self).__init__()
+        self.path = path
+        self._resolved = False
+        self._value = None
+
+    def __repr__(self):
+        return "LazyTarget({path!r})".format(path=self.path)
+
+    def resolve(self):
+        """
+        Walks the path, importing each part that is a module, and
+        getting each part that isn't as an attribute of the one before.
+        Modules are only imported once they are known to exist, so any
+        ImportError raised while importing one is its own, and is let
+        through.
+        """
+        if not self._resolved:
+            value = None
+            parts = self.path.split(".")
+            for i, part in enumerate(parts):
+                name = ".".join(parts[:i + 1])
+                if ((value is None or isinstance(value, types.ModuleType)) and
+                        (name in sys.modules or pkgutil.find_loader(name))):
+                    value = importlib.import_module(name)
+                elif value is None:
+                    raise ImportError("No module named {name}".format(name=name))
+                else:
+                    try:
+                        value = getattr(value, part)
+                    except AttributeError as error:
+                        raise ImportError("Cannot resolve {path}: {error}".format(path=self.path, error=error))
+            self._value = value
+            self._resolved = True
+        return self._value
+
+
+def _class_kinds(clas):
+    """
+    Returns a dict of the names in a class's own __dict__ to the kind of
+    value each entry is.
+    >>> class A(object):
+    ...   x = 5
+    >>> _class_kinds(A)['x']
+    'data'
+    >>> len(_raw_kind.calls) == len(A.__dict__)
+    True
+
+    Kinds are cached per class.
+    >>> _class_kinds(A)['x']
+    'data'
+    >>> len(_raw_kind.calls) == len(A.__dict__)
+    True
+
+    An entry's kind is worked out again if the entry has been replaced.
+    >>> A.x = lambda self: None
+    >>> _class_kinds(A)['x']
+    'method'
+    >>> _raw_kind.calls[-1] == (A.__dict__['x'],)
+    True
+    >>> del A.x
+    >>> 'x' in _class_kinds(A)
+    False
+    """
+    cached = _class_kinds_cache.get(clas)
+    if cached is None:
+        cached = _class_kinds_cache[clas] = {}
+    kinds = {}
+    for name, raw in clas.__dict__.items():
+        entry = cached.get(name)
+        if entry is None or entry[0] is not raw:
+            entry = cached[name] = (raw, _raw_kind(raw))
+        kinds[name] = entry[1]
+    if len(cached) != len(kinds):
+        for name in set(cached) - set(kinds):
+            del cached[name]
+    return kinds
+
+
+def copy_callable(name, original, new_globals=None, clas=None, kind=None):
     """
     Copies globals into a copy of the provided non-class callable
     >>> def f():
@@ -73,20 +198,21 @@ def copy_callable(name, original, new_globals=None, clas=None):
     Copying <type 'function'>: f
     >>> func = copy_callable("lamb", lamb, new_globals, A)
     Copying <type 'function'>: <lambda>
+
+    If the kind of callable is already known, it can be passed in, and
+    it won't be worked out again.
+    >>> meth = copy_callable("print_baz", A.print_baz, new_globals, A, _KIND_STATICMETHOD)
+    Copying staticmethod: print_baz
     """
-    if isinstance(original, types.MethodType):
-        if original.im_self:
-            return copy_classmethod(original, new_globals)
-        else:
-            return copy_method(original, clas, new_globals)
-    elif isinstance(original, types.FunctionType):
-        if clas and isinstance(getattr(clas, name, None), types.FunctionType):
-            # This is a staticmethod, because if it weren't, this would
-            # be a bound or unbound method
-            return copy_staticmethod(original, new_globals)
-        else:
-            # Just a regular function
-            return copy_function(original, new_globals)
+    kind = kind or _value_kind(name, original, clas)
+    if kind == _KIND_CLASSMETHOD:
+        return copy_classmethod(original, new_globals)
+    elif kind == _KIND_METHOD:
+        return copy_method(original, clas, new_globals)
+    elif kind == _KIND_STATICMETHOD:
+        return copy_staticmethod(original, new_globals)
+    elif kind == _KIND_FUNCTION:
+        return copy_function(original, new_globals)
     else:
         return original
 
@@ -100,23 +226,53 @@ def copy_class(clas, new_globals):
     >>> class OldStyle:
     ...     "An old style class"
     >>> A = copy_class(NewStyle, new_globals)
-    Copying <type 'dictproxy'>: __dict__
-    Copying <type 'str'>: __doc__
-    Copying <type 'str'>: __module__
-    Copying <type 'getset_descriptor'>: __weakref__
+    Copying data <type 'dictproxy'>: __dict__
+    Copying data <type 'str'>: __doc__
+    Copying data <type 'str'>: __module__
+    Copying data <type 'getset_descriptor'>: __weakref__
     >>> A = copy_class(OldStyle, new_globals)
-    Copying <type 'str'>: __doc__
-    Copying <type 'str'>: __module__
+    Copying data <type 'str'>: __doc__
+    Copying data <type 'str'>: __module__
+    >>> len(_raw_kind.calls)
+    6
+
+    The kinds of a class's attributes are only worked out again for the
+    ones that have changed since it was last copied.
+    >>> A = copy_class(NewStyle, new_globals)
+    Copying data <type 'dictproxy'>: __dict__
+    Copying data <type 'str'>: __doc__
+    Copying data <type 'str'>: __module__
+    Copying data <type 'getset_descriptor'>: __weakref__
+    >>> len(_raw_kind.calls)
+    6
+    >>> NewStyle.greet = 5
+    >>> A = copy_class(NewStyle, new_globals)
+    Copying data <type 'dictproxy'>: __dict__
+    Copying data <type 'str'>: __doc__
+    Copying data <type 'str'>: __module__
+    Copying data <type 'getset_descriptor'>: __weakref__
+    Copying data <type 'int'>: greet
+    >>> NewStyle.greet = lambda self: None
+    >>> A = copy_class(NewStyle, new_globals)
+    Copying data <type 'dictproxy'>: __dict__
+    Copying data <type 'str'>: __doc__
+    Copying data <type 'str'>: __module__
+    Copying data <type 'getset_descriptor'>: __weakref__
+    Copying method <type 'instancemethod'>: greet
+    >>> len(_raw_kind.calls)
+    8
     """
     copy_clas = clas
     if not issubclass(copy_clas, Mock):
+        kinds = _class_kinds(clas)
         copy_dict = dict(clas.__dict__)
         copy_clas = type(clas.__name__, (Mock,) + clas.__bases__, copy_dict)
         new_globals[clas.__name__] = copy_clas
 
         for name in sorted(copy_clas.__dict__):
             try:
-                copy_val = copy_value(name, getattr(copy_clas, name), new_globals, copy_clas)
+                copy_val = copy_value(
+                    name, getattr(copy_clas, name), new_globals, copy_clas, kinds.get(name))
                 setattr(copy_clas, name, copy_val)
             except (AttributeError, KeyError, TypeError):
                 pass
@@ -276,7 +432,7 @@ def copy_staticmethod(original, new_globals):
     return staticmethod(copy_function(original, new_globals))
 
 
-def copy_value(name, original, new_globals=None, clas=None):
+def copy_value(name, original, new_globals=None, clas=None, kind=None):
     """
     Makes a copy of a class, a function, a method, or a property
     >>> foo = new_globals['foo'] = range(5)
@@ -330,19 +486,138 @@ def copy_value(name, original, new_globals=None, clas=None):
     If a Mock object is passed, it is returned unchanged.
     >>> copy_value("print_foo", mock, new_globals, A) is mock
     True
+
+    If the kind of value is already known, it can be passed in, and it
+    won't be worked out again.
+    >>> prop = copy_value("qux", A.qux, new_globals, A, _KIND_PROPERTY)
+    Copying property
     """
-    if issubclass(original, Mock) if isinstance(original, type) else isinstance(original, Mock):
+    kind = kind or _value_kind(name, original, clas)
+    if kind == _KIND_MOCK:
         return original
-    elif isinstance(original, (types.ClassType, type)):
+    elif kind == _KIND_CLASS:
         return copy_class(original, new_globals)
-    elif isinstance(original, (types.FunctionType, types.MethodType)):
-        return copy_callable(name, original, new_globals, clas)
-    elif isinstance(original, property):
+    elif kind in _CALLABLE_KINDS:
+        return copy_callable(name, original, new_globals, clas, kind)
+    elif kind == _KIND_PROPERTY:
         return copy_property(original, new_globals)
     else:
         return copy_miscellanious(new_globals[name])
 
 
+def _raw_kind(raw):
+    """
+    Works out what kind of value a raw class __dict__ entry is.
+    >>> class A(object):
+    ...   r = range(5)
+    ...   def print_foo(self):
+    ...     pass
+    ...   @classmethod
+    ...   def print_bar(cls):
+    ...     pass
+    ...   @staticmethod
+    ...   def print_baz():
+    ...     pass
+    ...   @property
+    ...   def qux(self):
+    ...     pass
+    ...   class B(object):
+    ...     pass
+    ...   class C(Mock):
+    ...     pass
+    >>> for name in ('r', 'print_foo', 'print_bar', 'print_baz', 'qux', 'B', 'C'):
+    ...   print name, _raw_kind(A.__dict__[name])
+    r data
+    print_foo method
+    print_bar classmethod
+    print_baz staticmethod
+    qux property
+    B class
+    C mock
+    """
+    if isinstance(raw, classmethod):
+        return _KIND_CLASSMETHOD
+    elif isinstance(raw, staticmethod):
+        return _KIND_STATICMETHOD
+    elif isinstance(raw, types.FunctionType):
+        return _KIND_METHOD
+    else:
+        return _plain_kind(raw)
+
+
+def _value_kind(name, original, clas=None):
+    """
+    Works out what kind of value something is, for when it wasn't
+    looked up with _class_kinds.
+    >>> class A(object):
+    ...   def print_foo(self):
+    ...     pass
+    ...   @classmethod
+    ...   def print_bar(cls):
+    ...     pass
+    ...   @staticmethod
+    ...   def print_baz():
+    ...     pass
+    >>> _value_kind("print_foo", A.print_foo, A)
+    'method'
+    >>> _value_kind("print_bar", A.print_bar, A)
+    'classmethod'
+    >>> _value_kind("print_baz", A.print_baz, A)
+    'staticmethod'
+    >>> _value_kind("A", A)
+    'class'
+    >>> _value_kind("r", range(5))
+    'data'
+    """
+    if isinstance(original, types.MethodType):
+        return _KIND_CLASSMETHOD if original.im_self else _KIND_METHOD
+    elif isinstance(original, types.FunctionType):
+        if clas and isinstance(getattr(clas, name, None), types.FunctionType):
+            # This is a staticmethod, because if it weren't, this would
+            # be a bound or unbound method
+            return _KIND_STATICMETHOD
+        else:
+            # Just a regular function
+            return _KIND_FUNCTION
+    else:
+        return _plain_kind(original)
+
+
+def _plain_kind(value):
+    """
+    Works out the kinds that look the same whether or not they were
+    looked up through a class.
+    """
+    if issubclass(value, Mock) if isinstance(value, type) else isinstance(value, Mock):
+        return _KIND_MOCK
+    elif isinstance(value, (types.ClassType, type)):
+        return _KIND_CLASS
+    elif isinstance(value, property):
+        return _KIND_PROPERTY
+    else:
+        return _KIND_DATA
+
+
+class _LazyDocTest(doctest.DocTest):
+    """
+    This is a DocTest that applies its mocks the first time its globals
+    are used, rather than when it is made.  Neither DocTestFinder nor
+    DocTestCase look at the globals until the test runs.
+    """
+    def __init__(self, apply_mocks, *args, **kwargs):
+        doctest.DocTest.__init__(self, *args, **kwargs)
+        self._apply_mocks = apply_mocks
+        self._unmocked_globs = self.__dict__.pop("globs")
+
+    def __getattr__(self, name):
+        # DocTest is an old-style class, so this stands in for a
+        # property; it is only called while globs hasn't been set.
+        if name != "globs":
+            raise AttributeError(name)
+        self.globs = self._apply_mocks(self._unmocked_globs)
+        return self.globs
+
+
 class MockableDocTestParser(doctest.DocTestParser):
     """
     This is a DocTestParser that allows doctests to have variables
@@ -385,12 +660,23 @@ class MockableDocTestParser(doctest.DocTestParser):
         >>> new_globals = mdtp.apply_mocks(name="flintstone.fred", globs=globs)
         >>> print sorted(new_globals.items()) # doctest: +ELLIPSIS
         [('barney', 10), ('fred', 10)]
+
+        LazyTargets are resolved when the mocks are applied.
+        >>> mdtp = MockableDocTestParser(
+        ...   mocks={
+        ...     "flintstone": {
+        ...       "fred": {"fred": LazyTarget("os.sep")}}})
+        >>> import os
+        >>> mdtp.apply_mocks(name="flintstone.fred", globs=globs)['fred'] is os.sep
+        True
         """
         mocks = self.flatten_mocks()
         if name in mocks:
             new_globals = {}
             new_globals.update(globs)
-            new_globals.update(mocks[name])
+            new_globals.update(
+                (mock_name, mock.resolve() if isinstance(mock, LazyTarget) else mock)
+                for mock_name, mock in mocks[name].items())
 
             # mock the globals of the callable we're testing
             for mock_name in sorted(mocks[name]):
@@ -407,11 +693,53 @@ class MockableDocTestParser(doctest.DocTestParser):
             globs = new_globals
         return globs
 
+    def has_lazy_targets(self, name):
+        """
+        Returns whether any of the mocks for the named test are
+        LazyTargets.
+        >>> mdtp = MockableDocTestParser(
+        ...   mocks={
+        ...     "flintstone": {
+        ...       "fred": {"fred": 10},
+        ...       "wilma": {"wilma": LazyTarget("os.sep")}}})
+        >>> mdtp.has_lazy_targets("flintstone.fred")
+        False
+        >>> mdtp.has_lazy_targets("flintstone.wilma")
+        True
+        >>> mdtp.has_lazy_targets("flintstone.barney")
+        False
+        """
+        mocks = self.flatten_mocks().get(name, {})
+        return any(isinstance(mock, LazyTarget) for mock in mocks.values())
+
     def get_doctest(self, string, globs, name, filename, lineno):
         """
         Returns the DocTest for the string after applying the mocks that
         were provided in __init__.
+
+        If any of the mocks are LazyTargets, nothing is applied yet, so
+        that nothing gets imported while tests are being collected.  The
+        mocks are applied when the DocTest's globals are first used,
+        which is when it runs.
+        >>> mdtp = MockableDocTestParser(
+        ...   mocks={
+        ...     "flintstone": {
+        ...       "fred": {"fred": LazyTarget("os.sep")}}})
+        >>> dt = mdtp.get_doctest(">>> fred", {'fred': 5}, "flintstone.fred", None, 0)
+        >>> import os
+        >>> dt.globs['fred'] is os.sep
+        True
         """
+        if self.has_lazy_targets(name):
+            return _LazyDocTest(
+                functools.partial(self.apply_mocks, name),
+                self.get_examples(string, name),
+                globs,
+                name,
+                filename,
+                lineno,
+                string)
+
         # This applies the mocks to the globals directory that will
         # be used by the functions called from the test.
         applied = self.apply_mocks(name, globs)
@@ -426,3 +754,4 @@ class MockableDocTestParser(doctest.DocTestParser):
         # This applies the mocks to the test itself.
         dt.globs = self.apply_mocks(name, dt.globs)
         return dt
+
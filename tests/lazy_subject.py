@@ -0,0 +1,12 @@
+"""
+A module whose doctest is mocked with a LazyTarget.
+"""
+
+
+def h():
+    """
+    Calls f, which is only here if it has been mocked in.
+    >>> h()
+    'lazily mocked'
+    """
+    return f()  # noqa
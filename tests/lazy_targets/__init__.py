@@ -0,0 +1,4 @@
+"""
+Modules for testing LazyTarget.  Nothing in here should be imported
+until a test that mocks with it is about to run.
+"""
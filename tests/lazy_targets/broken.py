@@ -0,0 +1,5 @@
+import does_not_exist_dep  # noqa
+
+
+def g():
+    pass
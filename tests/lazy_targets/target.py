@@ -0,0 +1,2 @@
+def f():
+    return "lazily mocked"
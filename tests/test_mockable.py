@@ -1,7 +1,8 @@
 import doctest
 import sys
+import unittest
 
-from mockabledoctests import Mock, MockableDocTestParser, mockable
+from mockabledoctests import LazyTarget, Mock, MockCallable, MockableDocTestParser, mockable
 
 
 def printer(string, retval=None):
@@ -15,6 +16,38 @@ def printer(string, retval=None):
     return retval
 
 
+def counter(cal):
+    """
+    Makes a mock of a callable that keeps the arguments of each call
+    >>> counted_len = counter(len)
+    >>> counted_len("Fred")
+    4
+    >>> counted_len.calls
+    [('Fred',)]
+    """
+    mock = MockCallable(lambda *args: mock.calls.append(args) or cal(*args))
+    mock.calls = []
+    return mock
+
+
+def resolve(path):
+    """
+    Resolves a LazyTarget for a path.  Errors from importing the target
+    module itself aren't hidden.
+    >>> resolve("lazy_targets.broken.g")
+    Traceback (most recent call last):
+    ...
+    ImportError: No module named does_not_exist_dep
+
+    A missing attribute says what it was looking for.
+    >>> resolve("lazy_targets.target.nope")
+    Traceback (most recent call last):
+    ...
+    ImportError: Cannot resolve lazy_targets.target.nope: 'module' object has no attribute 'nope'
+    """
+    return LazyTarget(path).resolve()
+
+
 class empty_test_class(object):
     """
     An empty class for use with testing class mocking
@@ -89,6 +122,39 @@ class test_class(object):
         return self._qux
 
 
+class LazyTargetTest(unittest.TestCase):
+    """
+    Tests that LazyTargets aren't imported while tests are being
+    collected, but are by the time they run, with doctest's own runner.
+    """
+    lazy_modules = ("lazy_targets", "lazy_targets.target", "lazy_subject")
+
+    def setUp(self):
+        self.saved_modules = dict(
+            (name, sys.modules.pop(name))
+            for name in self.lazy_modules
+            if name in sys.modules)
+
+    def tearDown(self):
+        for name in self.lazy_modules:
+            sys.modules.pop(name, None)
+        sys.modules.update(self.saved_modules)
+
+    def test_not_imported_until_test_runs(self):
+        import lazy_subject
+        mdtp = MockableDocTestParser(
+            mocks={
+                "lazy_subject": {
+                    "h": {"f": LazyTarget("lazy_targets.target.f")}}})
+        suite = doctest.DocTestSuite(lazy_subject, test_finder=doctest.DocTestFinder(parser=mdtp))
+        self.assertNotIn("lazy_targets.target", sys.modules)
+
+        result = unittest.TestResult()
+        suite.run(result)
+        self.assertEqual((result.testsRun, result.errors, result.failures), (1, [], []))
+        self.assertIn("lazy_targets.target", sys.modules)
+
+
 def load_tests(loader, tests, ignore):
     # Create mocks for copy_callable
     copy_callable_mocks = {
@@ -99,9 +165,16 @@ def load_tests(loader, tests, ignore):
     }
     copy_callable_mocks['new_globals'] = dict(copy_callable_mocks)
 
-    # Create mocks for copy_class
+    # Create mocks for _class_kinds
+    class_kinds_mocks = {'_raw_kind': counter(mockable._raw_kind)}
+
+    # Create mocks for copy_class.  _class_kinds is mocked with itself, so
+    # that it is copied with the counting _raw_kind in its globals.
     copy_class_mocks = {
-        'copy_value': lambda name, value, new_globals, copy_class: printer("Copying %s: %s" % (type(value), name))}
+        '_class_kinds': mockable._class_kinds,
+        '_raw_kind': counter(mockable._raw_kind),
+        'copy_value': lambda name, value, new_globals, copy_class, kind=None: printer(
+            "Copying %s %s: %s" % (kind, type(value), name))}
     copy_class_mocks['new_globals'] = dict(copy_class_mocks)
 
     # Create mocks for copy_function
@@ -136,7 +209,8 @@ def load_tests(loader, tests, ignore):
     # Create mocks for copy_value
     copy_value_mocks = {
         'copy_miscellanious': lambda original: printer("Copying miscellanious: %s" % original),
-        'copy_callable': lambda name, original, new_globals, clas: printer("Copying callable: %s" % original.__name__),
+        'copy_callable': lambda name, original, new_globals, clas, kind=None: printer(
+            "Copying callable: %s" % original.__name__),
         'copy_property': lambda prop, new_globals: printer("Copying property"),
         'copy_class': lambda clas, new_globals: printer("Copying class: %s" % clas.__name__),
         'mock': Mock()}
@@ -159,6 +233,7 @@ def load_tests(loader, tests, ignore):
             __name__: {
                 "test_class": test_class_mocks},
             "mockabledoctests.mockable": {
+                '_class_kinds': class_kinds_mocks,
                 'copy_callable': copy_callable_mocks,
                 'copy_class': copy_class_mocks,
                 'copy_function': copy_function_mocks,